@@ -1,13 +1,27 @@
 import requests
-from bs4 import BeautifulSoup
-import json
-import jsonpath_ng as jp
+from requests.adapters import HTTPAdapter
+import orjson
+import re
 from dotenv import load_dotenv
 import os
 
 
 load_dotenv()
 
+# requests already sends "Accept-Encoding: gzip, deflate" and adds "br" when the
+# brotli package is installed, so reply pages arrive compressed.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+SESSION.headers.update(
+    {
+        "cookie": os.getenv("COOKIE"),
+        "user-agent": "threads-client",
+    }
+)
+
+_POST_ID_RE = re.compile(rb'"post_id"\s*:\s*"(\d+)"')
+_FB_DTSG_RE = re.compile(rb'<script[^>]*id="__eqmc"[^>]*>(\{.*?\})</script>', re.DOTALL)
+
 
 def get_threads_required_payload(url: str) -> dict:
     """
@@ -29,25 +43,19 @@ def get_threads_required_payload(url: str) -> dict:
             or processing the response.
 
     Note:
-        This function relies on environment variables for authentication headers.
+        This function relies on environment variables for authentication headers,
+        which are set once on the shared SESSION.
     """
 
-    headers = {
-        "cookie": os.getenv("COOKIE"),
-        "user-agent": "threads-client",
-    }
-
     try:
-        with requests.get(url=url, headers=headers) as response:
+        with SESSION.get(url=url) as response:
 
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.content, "html.parser")
-
             payload = {"post_id": None, "fb_dtsg": None}
 
-            payload["post_id"] = get_post_id(soup)
-            payload["fb_dtsg"] = get_fb_dtsg(soup)
+            payload["post_id"] = get_post_id(response.content)
+            payload["fb_dtsg"] = get_fb_dtsg(response.content)
 
             print(payload)
 
@@ -57,58 +65,50 @@ def get_threads_required_payload(url: str) -> dict:
         print("Failed to get required payload: ", e)
 
 
-def get_post_id(soup: BeautifulSoup) -> str:
+def get_post_id(html: bytes) -> str:
     """
-    Extracts the post ID from the HTML soup of a Threads page.
+    Extracts the post ID from the raw HTML of a Threads page.
 
-    This function searches for a script tag containing the post ID in the parsed HTML,
-    then uses JSONPath to extract the post ID from the JSON data within the script.
+    This function scans the page bytes for the first "post_id" JSON field instead of
+    parsing the document, so no DOM or JSON tree is built for the page.
 
     Args:
-        soup (BeautifulSoup): Parsed HTML content of the Threads page.
+        html (bytes): Raw HTML content of the Threads page.
 
     Returns:
         str: The post ID if found, None otherwise.
     """
 
-    script_tags = soup.find_all("script")
-
-    for script in script_tags:
-        script_content = script.string
+    match = _POST_ID_RE.search(html)
 
-        if script_content and "post_id" in script_content:
-            try:
-                post_id_script = json.loads(script_content)
-                post_id_expr = jp.parse("$..post_id")
-                return [match.value for match in post_id_expr.find(post_id_script)][0]
-            except json.JSONDecodeError as e:
-                print(f"Error parsing JSON: {e}")
+    if match:
+        return match.group(1).decode()
 
     print("Error: Could not find post_id")
     return None
 
 
-def get_fb_dtsg(soup: BeautifulSoup) -> str:
+def get_fb_dtsg(html: bytes) -> str:
     """
-    Extracts the Facebook DTSG token from the HTML soup of a Threads page.
+    Extracts the Facebook DTSG token from the raw HTML of a Threads page.
 
-    This function looks for a specific script tag with id '__eqmc', parses its content
-    as JSON, and extracts the Facebook DTSG token.
+    This function scans the page bytes for the script tag with id '__eqmc', parses
+    only that script's content as JSON with orjson, and extracts the Facebook DTSG token.
 
     Args:
-        soup (BeautifulSoup): Parsed HTML content of the Threads page.
+        html (bytes): Raw HTML content of the Threads page.
 
     Returns:
         str: The Facebook DTSG token if found, None otherwise.
 
     Raises:
         AttributeError: If the required script tag is not found.
-        json.JSONDecodeError: If there's an error parsing the script content as JSON.
+        orjson.JSONDecodeError: If there's an error parsing the script content as JSON.
         KeyError: If the expected key is not found in the parsed JSON.
     """
     try:
-        fb_dtsg_script = json.loads(soup.find("script", id="__eqmc").string)
+        fb_dtsg_script = orjson.loads(_FB_DTSG_RE.search(html).group(1))
         return fb_dtsg_script["f"]
-    except (AttributeError, json.JSONDecodeError, KeyError) as e:
+    except (AttributeError, orjson.JSONDecodeError, KeyError) as e:
         print(f"Error get fb_dtsg: {e}")
         return None
@@ -1,34 +1,71 @@
 import requests
-import json
+import ijson
+import orjson
 from datetime import datetime
 import argparse
+import csv
+import functools
+import operator
+from concurrent.futures import ThreadPoolExecutor
 import os
+from typing import Iterable, Iterator
 from dotenv import load_dotenv
-import pandas as pd
+import urllib3
+import pyarrow as pa
+import pyarrow.parquet as pq
+import xlsxwriter
 import threads_payload
 
 
 load_dotenv()
 
+_URL = operator.itemgetter("url")
+
+_THREAD_ITEMS_PREFIX = "data.data.edges.item.node.thread_items"
+_PAGE_INFO_PREFIX = "data.data.page_info"
+
+PARQUET_BATCH_SIZE = 1000
+
+REPLY_SCHEMA = pa.schema(
+    [
+        ("id", pa.string()),
+        ("code", pa.string()),
+        ("timestamp", pa.string()),
+        ("like_count", pa.int64()),
+        ("direct_reply_count", pa.int64()),
+        ("repost_count", pa.int64()),
+        ("quote_count", pa.int64()),
+        ("user_id", pa.string()),
+        ("username", pa.string()),
+        ("is_verified", pa.bool_()),
+        ("profile_pic_url", pa.string()),
+        ("text", pa.string()),
+        ("media_type", pa.int64()),
+        ("accessibility_caption", pa.string()),
+        ("img_urls", pa.list_(pa.string())),
+    ]
+)
+
 
 def get_threads_post_reply(
     post_id: str,
     fb_dtsg: str,
-) -> dict:
+) -> Iterator[dict]:
     """
     Fetches and processes replies to a Threads post.
 
     This function makes paginated API requests to retrieve all replies to a specific
     Threads post. It processes the response data and extracts relevant information
     about each reply, including user details, post content, and engagement metrics.
+    Replies are yielded as each page arrives, so they can be written out without
+    holding every reply in memory.
 
     Args:
         post_id (str): The unique identifier of the Threads post to fetch replies for.
         fb_dtsg (str): The Facebook DTSG token required for authentication.
 
-    Returns:
-        Dict[str, Dict]: A dictionary where each key is a reply post ID and the value
-        is a dictionary containing detailed information about that reply, including:
+    Yields:
+        dict: A dictionary containing detailed information about a reply, including:
         - id: The unique identifier of the reply post
         - code: The code associated with the reply post
         - timestamp: The creation time of the reply
@@ -51,113 +88,217 @@ def get_threads_post_reply(
 
     Note:
         This function relies on environment variables for authentication headers and
-        makes use of pagination to retrieve all replies. It handles potential errors
-        in API requests but may not capture all possible edge cases.
+        reuses the shared threads_payload.SESSION connection pool across pages. It
+        makes use of pagination to retrieve all replies, prefetching each next page
+        on a background worker while the current page is processed. It handles
+        potential errors in API requests but may not capture all possible edge cases.
     """
 
     url = "https://www.threads.net/api/graphql"
 
     headers = {
-        "cookie": os.getenv("COOKIE"),
         "content-type": "application/x-www-form-urlencoded",
-        "user-agent": "threads-client",
         "x-ig-app-id": "238260118697367",
     }
 
-    all_scraped_data = {}
-    end_cursor = None
-    has_next_page = True
-
-    while has_next_page:
-        data = {
-            "fb_dtsg": fb_dtsg,
-            "doc_id": "8146902565367397",
-        }
-
-        variables = {
-            "postID": post_id,
-            "__relay_internal__pv__BarcelonaIsLoggedInrelayprovider": True,
-            "__relay_internal__pv__BarcelonaShouldShowFediverseM1Featuresrelayprovider": True,
-            "__relay_internal__pv__BarcelonaIsInlineReelsEnabledrelayprovider": True,
-            "__relay_internal__pv__BarcelonaUseCometVideoPlaybackEnginerelayprovider": False,
-            "__relay_internal__pv__BarcelonaOptionalCookiesEnabledrelayprovider": False,
-            "__relay_internal__pv__BarcelonaShowReshareCountrelayprovider": False,
-            "__relay_internal__pv__BarcelonaQuotePostImpressionLoggingEnabledrelayprovider": False,
-            "__relay_internal__pv__BarcelonaShouldShowFediverseM075Featuresrelayprovider": True,
-        }
-
-        if end_cursor:
-            variables["after"] = end_cursor["end_cursor"]
-
-        data["variables"] = json.dumps(variables)
-
-        try:
-            with requests.post(url, headers=headers, data=data) as response:
-
-                response.raise_for_status()
-
-                response = response.json()
-
-                threads_replies = response["data"]["data"]["edges"]
-                page_info = response["data"]["data"]["page_info"]
-                has_next_page = page_info["has_next_page"]
-                end_cursor = page_info
-
-                for threads_reply in threads_replies:
-                    post = threads_reply["node"]["thread_items"][0]["post"]
-
-                    detail = {
-                        "id": post["id"],
-                        "code": post["code"],
-                        "timestamp": datetime.fromtimestamp(post["taken_at"]).strftime(
-                            "%Y-%m-%d %H:%M:%S"
-                        ),
-                        "like_count": post["like_count"],
-                        "direct_reply_count": post["text_post_app_info"][
-                            "direct_reply_count"
-                        ],
-                        "repost_count": post["text_post_app_info"]["repost_count"],
-                        "quote_count": post["text_post_app_info"]["quote_count"],
-                        "user_id": post["user"]["id"],
-                        "username": post["user"]["username"],
-                        "is_verified": post["user"]["is_verified"],
-                        "profile_pic_url": post["user"]["profile_pic_url"],
-                        "text": (
-                            post["caption"]["text"]
-                            if post.get("caption") and post["caption"].get("text")
-                            else None
-                        ),
-                        "media_type": post["media_type"],
-                        "accessibility_caption": post["accessibility_caption"],
-                        "img_urls": [
-                            img["url"] for img in post["image_versions2"]["candidates"]
-                        ],
-                    }
-
-                    all_scraped_data[post["id"]] = detail
-
-        except requests.exceptions.RequestException as e:
-            print("Failed to get reply data: ", e)
-
-    return all_scraped_data
+    # Built once and reused for every page; only the "after" cursor changes.
+    data = {
+        "fb_dtsg": fb_dtsg,
+        "doc_id": "8146902565367397",
+    }
+
+    variables = {
+        "postID": post_id,
+        "__relay_internal__pv__BarcelonaIsLoggedInrelayprovider": True,
+        "__relay_internal__pv__BarcelonaShouldShowFediverseM1Featuresrelayprovider": True,
+        "__relay_internal__pv__BarcelonaIsInlineReelsEnabledrelayprovider": True,
+        "__relay_internal__pv__BarcelonaUseCometVideoPlaybackEnginerelayprovider": False,
+        "__relay_internal__pv__BarcelonaOptionalCookiesEnabledrelayprovider": False,
+        "__relay_internal__pv__BarcelonaShowReshareCountrelayprovider": False,
+        "__relay_internal__pv__BarcelonaQuotePostImpressionLoggingEnabledrelayprovider": False,
+        "__relay_internal__pv__BarcelonaShouldShowFediverseM075Featuresrelayprovider": True,
+    }
+
+    data["variables"] = orjson.dumps(variables).decode()
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        next_page = executor.submit(fetch_reply_page, url, headers, data)
+
+        while next_page:
+            try:
+                posts, page_info = next_page.result()
+            except (
+                requests.exceptions.RequestException,
+                urllib3.exceptions.HTTPError,
+                ijson.JSONError,
+            ) as e:
+                print("Failed to get reply data: ", e)
+                next_page = executor.submit(fetch_reply_page, url, headers, data)
+                continue
+
+            # Request the next page before processing this one so the edge
+            # extraction below overlaps with the next network round trip.
+            if page_info["has_next_page"]:
+                variables["after"] = page_info["end_cursor"]
+                data["variables"] = orjson.dumps(variables).decode()
+                next_page = executor.submit(fetch_reply_page, url, headers, data)
+            else:
+                next_page = None
+
+            for post in posts:
+                yield parse_reply_post(post)
+
+
+def parse_reply_post(post: dict) -> dict:
+    """
+    Extracts the reply details from a single Threads post node.
+
+    Only the fields listed in get_threads_post_reply are read; the rest of the
+    post node is left untouched.
+
+    Args:
+        post (dict): The "post" object of a reply edge's first thread item.
+
+    Returns:
+        dict: The flattened reply details.
+    """
+
+    text_post_app_info = post["text_post_app_info"]
+    user = post["user"]
+    caption = post.get("caption") or {}
+
+    return {
+        "id": post["id"],
+        "code": post["code"],
+        "timestamp": format_timestamp(post["taken_at"]),
+        "like_count": post["like_count"],
+        "direct_reply_count": text_post_app_info["direct_reply_count"],
+        "repost_count": text_post_app_info["repost_count"],
+        "quote_count": text_post_app_info["quote_count"],
+        "user_id": user["id"],
+        "username": user["username"],
+        "is_verified": user["is_verified"],
+        "profile_pic_url": user["profile_pic_url"],
+        "text": caption.get("text") or None,
+        "media_type": post["media_type"],
+        "accessibility_caption": post["accessibility_caption"],
+        "img_urls": list(map(_URL, post["image_versions2"]["candidates"])),
+    }
+
+
+@functools.lru_cache(maxsize=4096)
+def format_timestamp(timestamp: int) -> str:
+    """
+    Formats a Unix timestamp as a local "%Y-%m-%d %H:%M:%S" string.
+
+    Uses isoformat instead of strftime to skip format-string interpretation, and
+    caches results because replies on the same post often share timestamps.
+
+    Args:
+        timestamp (int): The Unix timestamp in seconds.
+
+    Returns:
+        str: The formatted local date and time.
+    """
+
+    return datetime.fromtimestamp(timestamp).isoformat(sep=" ", timespec="seconds")
+
+
+def fetch_reply_page(url: str, headers: dict, data: dict) -> tuple[list, dict]:
+    """
+    Requests a single page of Threads post replies.
+
+    This function is submitted to a background worker by get_threads_post_reply so
+    that the next page is fetched while the current one is being processed. The
+    response body is streamed into parse_reply_page rather than decoded in full.
+
+    Args:
+        url (str): The Threads GraphQL endpoint.
+        headers (dict): Request headers added on top of the shared session headers.
+        data (dict): The GraphQL form data for the requested page.
+
+    Returns:
+        tuple[list, dict]: The reply posts and the page_info of the page.
+
+    Raises:
+        requests.exceptions.RequestException: If there's an error in making the request.
+        urllib3.exceptions.HTTPError: If the connection fails while streaming the body.
+        ijson.JSONError: If the response body is not valid JSON.
+    """
+
+    with threads_payload.SESSION.post(
+        url, headers=headers, data=data, stream=True
+    ) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        return parse_reply_page(response.raw)
+
+
+def parse_reply_page(stream) -> tuple[list, dict]:
+    """
+    Incrementally parses a GraphQL reply page, keeping only what the scraper uses.
+
+    Only each edge's thread_items list and the page_info object are built into
+    Python objects; every other part of the response is skipped as it streams past.
+
+    Args:
+        stream: A binary file-like object containing the GraphQL JSON response.
+
+    Returns:
+        tuple[list, dict]: The "post" of each edge's first thread item, and the
+        page_info object (empty if the response has none).
+
+    Raises:
+        ijson.JSONError: If the stream is not valid JSON.
+    """
+
+    posts = []
+    page_info = {}
+    builder = None
+    target = None
+
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        if builder is None:
+            if prefix not in (_THREAD_ITEMS_PREFIX, _PAGE_INFO_PREFIX):
+                continue
+            if event not in ("start_array", "start_map"):
+                continue
+            builder = ijson.ObjectBuilder()
+            target = prefix
+
+        builder.event(event, value)
+
+        if prefix == target and event in ("end_array", "end_map"):
+            if target == _THREAD_ITEMS_PREFIX:
+                posts.append(builder.value[0]["post"])
+            else:
+                page_info = builder.value
+            builder = None
+
+    return posts, page_info
 
 
 def save_data(
-    data: dict, post_id: str, output_file_type: str = "json", output_dir: "str" = "data"
+    data: Iterable[dict],
+    post_id: str,
+    output_file_type: str = "json",
+    output_dir: "str" = "data",
 ) -> None:
     """
     Saves the provided data to a file in the specified format and directory.
 
-    This function takes a dictionary of data and saves it to a file. The file format
-    can be JSON, CSV, or XLSX. The function creates the output directory if it doesn't
-    exist and uses a timestamp in the filename to ensure uniqueness.
+    This function takes an iterable of reply details and writes each entry to the file
+    as it is produced. The file format can be JSON, CSV, XLSX, or Parquet. The function
+    creates the output directory if it doesn't exist and uses a timestamp in the
+    filename to ensure uniqueness.
 
     Args:
-        data (dict): The data to be saved. Expected to be a dictionary where each key
-                     represents a unique entry.
+        data (Iterable[dict]): The data to be saved, such as the generator returned by
+                               get_threads_post_reply. Each entry must have an "id".
         post_id (str): The threads post_id.
         output_file_type (str, optional): The desired output file format.
-                                          Options are "json", "csv", or "xlsx".
+                                          Options are "json", "csv", "xlsx",
+                                          or "parquet".
                                           Defaults to "json".
         output_dir (str, optional): The directory where the output file will be saved.
                                     Defaults to "data".
@@ -170,11 +311,14 @@ def save_data(
 
     Note:
         - The function uses the current timestamp in the filename to avoid overwriting.
-        - For CSV and XLSX formats, the data is converted to a pandas DataFrame.
+        - Entries are streamed to disk one at a time. The JSON file is an object keyed
+          by entry id, and XLSX is written with xlsxwriter in constant-memory mode.
+        - Parquet entries are buffered as columns and written in batches of
+          PARQUET_BATCH_SIZE rows using REPLY_SCHEMA.
         - The function prints the location of the saved file and the total number of entries.
 
     Example:
-        >>> data = {"entry1": {"field1": "value1"}, "entry2": {"field1": "value2"}}
+        >>> data = [{"id": "1", "field1": "value1"}, {"id": "2", "field1": "value2"}]
         >>> post_id = "3422371711650451662"
         >>> save_data(data, post_id, output_file_type="csv", output_dir="output")
         Threads replies already save as output/2023-08-12_15-30-45.csv
@@ -187,22 +331,68 @@ def save_data(
     current_timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     filename = f"{output_dir}/{current_timestamp}_{post_id}"
 
+    total = 0
+
     if output_file_type.lower() == "json":
-        with open(f"{filename}.json", "w") as json_file:
-            json.dump(data, json_file, indent=2)
+        with open(f"{filename}.json", "wb") as json_file:
+            for total, detail in enumerate(data, start=1):
+                json_file.write(b",\n  " if total > 1 else b"{\n  ")
+                json_file.write(orjson.dumps(detail["id"]) + b": ")
+                json_file.write(
+                    orjson.dumps(detail, option=orjson.OPT_INDENT_2).replace(
+                        b"\n", b"\n  "
+                    )
+                )
+            json_file.write(b"\n}" if total else b"{}")
         print(f"Threads replies already save as {filename}.json")
 
     elif output_file_type.lower() == "csv":
-        df = pd.DataFrame.from_dict(data, orient="index")
-        df.to_csv(f"{filename}.csv", index=False)
+        with open(f"{filename}.csv", "w", newline="", encoding="utf-8") as csv_file:
+            writer = None
+            for total, detail in enumerate(data, start=1):
+                if writer is None:
+                    writer = csv.DictWriter(
+                        csv_file, fieldnames=detail.keys(), lineterminator="\n"
+                    )
+                    writer.writeheader()
+                writer.writerow(detail)
         print(f"Threads replies already save as {filename}.csv")
 
     elif output_file_type.lower() == "xlsx":
-        df = pd.DataFrame.from_dict(data, orient="index")
-        df.to_excel(f"{filename}.xlsx", index=False)
+        with xlsxwriter.Workbook(
+            f"{filename}.xlsx",
+            {
+                "constant_memory": True,
+                "strings_to_formulas": False,
+                "strings_to_urls": False,
+            },
+        ) as workbook:
+            worksheet = workbook.add_worksheet()
+            for total, detail in enumerate(data, start=1):
+                if total == 1:
+                    worksheet.write_row(0, 0, list(detail.keys()))
+                worksheet.write_row(
+                    total,
+                    0,
+                    [str(v) if isinstance(v, list) else v for v in detail.values()],
+                )
         print(f"Threads replies already save as {filename}.xlsx")
 
-    print(f"Total data: {len(data)}")
+    elif output_file_type.lower() == "parquet":
+        columns = {name: [] for name in REPLY_SCHEMA.names}
+        with pq.ParquetWriter(f"{filename}.parquet", REPLY_SCHEMA) as writer:
+            for total, detail in enumerate(data, start=1):
+                for name, column in columns.items():
+                    column.append(detail[name])
+                if total % PARQUET_BATCH_SIZE == 0:
+                    writer.write_table(pa.table(columns, schema=REPLY_SCHEMA))
+                    for column in columns.values():
+                        column.clear()
+            if columns["id"]:
+                writer.write_table(pa.table(columns, schema=REPLY_SCHEMA))
+        print(f"Threads replies already save as {filename}.parquet")
+
+    print(f"Total data: {total}")
 
 
 def main() -> None:
@@ -216,9 +406,9 @@ def main() -> None:
     parser.add_argument(
         "--format",
         type=str,
-        choices=["json", "csv", "xlsx"],
+        choices=["json", "csv", "xlsx", "parquet"],
         default="json",
-        help="Output file format, options: json, csv, xlsx (default: json)",
+        help="Output file format, options: json, csv, xlsx, parquet (default: json)",
     )
     parser.add_argument(
         "--output_dir",